@@ -4,9 +4,10 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
 import pandas as pd
-import time
 import logging
+import time
 import pytesseract
 from PIL import Image
 import platform
@@ -14,23 +15,65 @@ import platform
 # Configure Tesseract path for Windows
 if platform.system() == 'Windows':
     pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+
+# Check for the Tesseract executable once instead of on every OCR call
+try:
+    pytesseract.get_tesseract_version()
+    _TESSERACT_OK = True
+except pytesseract.TesseractNotFoundError:
+    _TESSERACT_OK = False
+
+# tesserocr keeps a Tesseract instance alive between images (optional, falls back to pytesseract)
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+# OpenCV is used to binarise screenshots before OCR (optional, raw screenshots are used without it)
+try:
+    import cv2
+    import numpy as np
+except ImportError:
+    cv2 = None
+
+# Tender result PDFs are downloaded and parsed directly when these are available (optional,
+# the browser PDF viewer is used without them)
+try:
+    import requests
+    import pdfplumber
+except ImportError:
+    requests = None
+    pdfplumber = None
+
+try:
+    from pdf2image import convert_from_bytes
+except ImportError:
+    convert_from_bytes = None
 import io
 import re
+import calendar
+import json
 from datetime import datetime
 import sys
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import List, Tuple, Optional
 
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
+    format='%(asctime)s - %(threadName)s - %(levelname)s - %(message)s',
     handlers=[
         logging.FileHandler('ura_scraper.log'),
         logging.StreamHandler()
     ]
 )
 
+URA_MAPS_URL = "https://eservice.ura.gov.sg/maps/?service=GLSRELEASE"
+
+
 class XPaths:
     """XPath constants for URA website elements"""
     # Main search elements
@@ -52,6 +95,81 @@ class XPaths:
     PDF_PAGE = "//canvas | //div[contains(@class, 'textLayer')]"
 
 
+class CSSSelectors:
+    """CSS selector constants for URA website elements"""
+    # Project details popup (various possible selectors)
+    POPUP_CONTENT = ".popup-content, .info-window, .details-panel"
+    
+    # Main search elements
+    SEARCH_BOX = "#us-s-txt"
+
+
+# Month names and abbreviations to month number (avoids locale-dependent strptime)
+_MONTH_ABBRS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+_MONTHS = {}
+for _number, _name in enumerate(('january', 'february', 'march', 'april', 'may', 'june', 'july',
+                                 'august', 'september', 'october', 'november', 'december'), start=1):
+    _MONTHS[_name] = _number
+    _MONTHS[_name[:3]] = _number
+_MONTHS['sept'] = 9
+
+# Day, month name and year in popup text, optionally preceded by the "DATE OF AWARD" label.
+# Only real month names match, so words like "ha" or "of" can't consume the day of the next date,
+# and 2-digit years are only accepted in the hyphenated "7-Aug-24" form.
+_DATE_RE = re.compile(
+    r'(?P<award>DATE OF AWARD[^\d]*)?(?P<day>\d{1,2})(?:'
+    r'[-\s]+(?P<month>' + '|'.join(sorted(_MONTHS, key=len, reverse=True)) + r')(?![A-Za-z])[-\s]+(?P<year>\d{4})'
+    r'|-(?P<short_month>' + '|'.join(_MONTH_ABBRS) + r')-(?P<short_year>\d{2})'
+    r')(?!\d)',
+    re.IGNORECASE
+)
+
+# Ranking (1, 2, 3, etc.) followed by company name in the tender results table
+_RANKING_RE = re.compile(r'^\s*(\d+)\s+(.+)$')
+
+# Columns filled in by the scraper
+TENDERER_COLUMNS = ['Name of Successful Tenderer'] + [f'Name of Other Participating Tenderer - {i}' for i in range(1, 5)]
+
+# Completed projects are checkpointed here (one JSON object per line) so a rerun can resume
+CACHE_FILE = 'ura_scraper.cache.jsonl'
+_cache_lock = threading.Lock()
+
+# Timeout (seconds) for elements that must appear before we can carry on
+DEFAULT_WAIT_TIMEOUT = 15
+
+# Timeout (seconds) for a popup to disappear after closing it; it may stay open, so keep this short
+POPUP_CLOSE_TIMEOUT = 5
+
+# Timeout (seconds) for elements that may legitimately be absent, e.g. a popup close button
+OPTIONAL_ELEMENT_TIMEOUT = 1
+
+# Block stylesheets as well as images; off by default because the popup visibility waits depend on CSS
+BLOCK_STYLESHEETS = False
+
+# Pause (seconds) each worker takes between projects to avoid overloading the server
+PROJECT_DELAY_SECONDS = 2
+
+# Maximum number of Chrome instances running in parallel (each one is memory hungry)
+MAX_WORKERS = 3
+
+# Each worker thread lazily gets its own Chrome driver
+_thread_local = threading.local()
+_drivers: List[webdriver.Chrome] = []
+_drivers_lock = threading.Lock()
+
+# Resolved chromedriver path, shared by all workers so version resolution only happens once
+_DRIVER_PATH: Optional[str] = None
+_driver_path_lock = threading.Lock()
+
+# Let webdriver-manager persist its driver cache between runs
+os.environ.setdefault('WDM_LOCAL', '1')
+
+# Use one long-lived tesserocr API per worker thread instead of spawning Tesseract per image
+USE_TESSEROCR = True
+_ocr_apis: list = []
+_ocr_apis_lock = threading.Lock()
+
+
 def check_dependencies():
     """Check if all required dependencies are installed"""
     missing_deps = []
@@ -75,9 +193,7 @@ def check_dependencies():
     try:
         import pytesseract
         # Check if Tesseract OCR is installed
-        try:
-            pytesseract.get_tesseract_version()
-        except pytesseract.TesseractNotFoundError:
+        if not _TESSERACT_OK:
             missing_deps.append("Tesseract OCR (executable)")
     except ImportError:
         missing_deps.append("pytesseract")
@@ -99,101 +215,234 @@ def check_dependencies():
 def format_date_for_search(date_input) -> str:
     """Convert date from Excel format to expected search format"""
     if isinstance(date_input, datetime):
-        # If date is already a datetime object
-        return date_input.strftime("%d-%b-%y").lstrip("0")
-    elif isinstance(date_input, str):
-        try:
-            # If date is a string, try to parse it
-            if " " in date_input:  # For format like "2025-03-13 00:00:00"
-                date_obj = datetime.strptime(date_input.split(" ")[0], "%Y-%m-%d")
-            else:  # For format like "2025-03-13"
-                date_obj = datetime.strptime(date_input, "%Y-%m-%d")
-            return date_obj.strftime("%d-%b-%y").lstrip("0")
-        except ValueError:
-            # If above parsing fails, try other common formats
-            try:
-                date_obj = datetime.strptime(date_input, "%d-%b-%y")
-                return date_input  # Already in correct format
-            except:
-                logging.warning(f"Unable to parse date: {date_input}")
-                return date_input
+        # If date is already a datetime object (including pd.Timestamp), format its ISO string
+        # so repeated award dates hit the cache
+        date_input = date_input.isoformat(sep=' ')
+    if isinstance(date_input, str):
+        return _format_date_string(date_input)
     return str(date_input)
 
 
+@lru_cache(maxsize=1024)
+def _format_date_string(date_input: str) -> str:
+    """Convert a date string to expected search format (memoized, dates repeat across projects)"""
+    try:
+        # If date is a string, try to parse it
+        if " " in date_input:  # For format like "2025-03-13 00:00:00"
+            date_obj = datetime.strptime(date_input.split(" ")[0], "%Y-%m-%d")
+        else:  # For format like "2025-03-13"
+            date_obj = datetime.strptime(date_input, "%Y-%m-%d")
+        return date_obj.strftime("%d-%b-%y").lstrip("0")
+    except ValueError:
+        # If above parsing fails, try other common formats
+        try:
+            date_obj = datetime.strptime(date_input, "%d-%b-%y")
+            return date_input  # Already in correct format
+        except:
+            logging.warning(f"Unable to parse date: {date_input}")
+            return date_input
+
+
+def get_driver_path() -> str:
+    """Resolve the chromedriver path once and reuse it for every driver"""
+    global _DRIVER_PATH
+    from webdriver_manager.chrome import ChromeDriverManager
+    
+    with _driver_path_lock:
+        if _DRIVER_PATH is None:
+            _DRIVER_PATH = ChromeDriverManager().install()
+        return _DRIVER_PATH
+
+
 def setup_driver() -> webdriver.Chrome:
     """Set up Chrome driver with options"""
-    from webdriver_manager.chrome import ChromeDriverManager
     from selenium.webdriver.chrome.service import Service
     
     chrome_options = Options()
-    chrome_options.add_argument('--start-maximized')
+    chrome_options.add_argument('--headless=new')
+    chrome_options.add_argument('--window-size=1920,1080')  # Keep screenshots large enough for OCR
+    chrome_options.page_load_strategy = 'eager'  # Return once the DOM is ready, not after every subresource
     chrome_options.add_argument('--disable-notifications')
     chrome_options.add_argument('--disable-popup-blocking')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--blink-settings=imagesEnabled=false')
     
     # Add prefs for PDF handling
-    chrome_options.add_experimental_option('prefs', {
+    prefs = {
         "download.default_directory": os.getcwd(),
         "download.prompt_for_download": False,
         "download.directory_upgrade": True,
         "plugins.always_open_pdf_externally": False,
         "plugins.plugins_disabled": [],
-    })
+        # Map tiles and icons are not needed to read the popups
+        "profile.managed_default_content_settings.images": 2,
+    }
+    if BLOCK_STYLESHEETS:
+        prefs["profile.managed_default_content_settings.stylesheet"] = 2
+    chrome_options.add_experimental_option('prefs', prefs)
     
     try:
         # Use ChromeDriverManager to automatically download and manage the driver
-        service = Service(ChromeDriverManager().install())
+        service = Service(get_driver_path())
         driver = webdriver.Chrome(service=service, options=chrome_options)
     except Exception as e:
         logging.error(f"Error setting up Chrome driver: {str(e)}")
         logging.error("Please make sure Chrome browser is installed")
         sys.exit(1)
     
-    driver.implicitly_wait(10)
+    # Shared explicit waits, reused by every lookup on this driver
+    driver._wait = WebDriverWait(driver, DEFAULT_WAIT_TIMEOUT)
+    driver._wait_close = WebDriverWait(driver, POPUP_CLOSE_TIMEOUT)
+    driver._wait_short = WebDriverWait(driver, OPTIONAL_ELEMENT_TIMEOUT)
+    
+    # The URA map page is loaded once and reused for every search on this driver
+    driver._ura_loaded = False
     return driver
 
 
-def extract_date_from_text(text: str) -> Optional[str]:
-    """Extract date from text in various formats"""
-    date_patterns = [
-        r'DATE OF AWARD[^\d]*(\d{1,2})[-\s]+([A-Za-z]+)[-\s]+(\d{4})',
-        r'(\d{1,2})[-\s]+([A-Za-z]+)[-\s]+(\d{4})',
-        r'(\d{1,2})-([A-Za-z]{3})-(\d{2})'
-    ]
-    
-    for pattern in date_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
+def get_thread_driver() -> webdriver.Chrome:
+    """Return the Chrome driver owned by the current thread, creating it on first use"""
+    driver = getattr(_thread_local, 'driver', None)
+    if driver is None:
+        driver = setup_driver()
+        _thread_local.driver = driver
+        with _drivers_lock:
+            _drivers.append(driver)
+    return driver
+
+
+def quit_drivers():
+    """Quit every driver created by the worker threads"""
+    with _drivers_lock:
+        for driver in _drivers:
             try:
-                day = match.group(1)
-                month = match.group(2)
-                year = match.group(3)
-                
-                # Handle 2-digit year
-                if len(year) == 2:
-                    year = f"20{year}"
-                
-                # Parse date
-                date_str = f"{day} {month} {year}"
-                parsed_date = datetime.strptime(date_str, "%d %B %Y") if len(month) > 3 else datetime.strptime(date_str, "%d %b %Y")
-                
-                # Return in format matching CSV: "7-Aug-24"
-                return parsed_date.strftime("%d-%b-%y").lstrip("0")
+                driver.quit()
             except Exception as e:
-                logging.warning(f"Error parsing date: {str(e)}")
-                continue
-    return None
+                logging.warning(f"Error quitting driver: {str(e)}")
+        _drivers.clear()
 
 
-def verify_project_date(driver: webdriver.Chrome, expected_date: str) -> bool:
-    """Verify that the project's award date matches what we expect"""
+def get_thread_ocr_api():
+    """Return the tesserocr API owned by the current thread, or None if unavailable"""
+    if not USE_TESSEROCR or tesserocr is None:
+        return None
+    if not hasattr(_thread_local, 'ocr_api'):
+        try:
+            api = tesserocr.PyTessBaseAPI(lang='eng')
+            with _ocr_apis_lock:
+                _ocr_apis.append(api)
+        except Exception as e:
+            logging.warning(f"Could not initialise tesserocr, falling back to pytesseract: {str(e)}")
+            api = None
+        _thread_local.ocr_api = api
+    return _thread_local.ocr_api
+
+
+def close_ocr_apis():
+    """Release every tesserocr API created by the worker threads"""
+    with _ocr_apis_lock:
+        for api in _ocr_apis:
+            try:
+                api.End()
+            except Exception as e:
+                logging.warning(f"Error closing tesserocr API: {str(e)}")
+        _ocr_apis.clear()
+
+
+def preprocess_for_ocr(image: Image.Image) -> Image.Image:
+    """Convert a screenshot to a black and white image that Tesseract reads more reliably"""
+    if cv2 is None:
+        return image
+    arr = np.array(image.convert('RGB'))
+    gray = cv2.cvtColor(arr, cv2.COLOR_RGB2GRAY)
+    _, thresholded = cv2.threshold(gray, 128, 255, cv2.THRESH_BINARY)
+    return Image.fromarray(thresholded)
+
+
+def ocr_image(image: Image.Image) -> str:
+    """Run OCR on an image, reusing the thread's tesserocr API when available"""
+    api = get_thread_ocr_api()
+    if api is not None:
+        api.SetImage(image)
+        return api.GetUTF8Text()
+    return pytesseract.image_to_string(image)
+
+
+def extract_date_from_text(text: str) -> Optional[str]:
+    """Extract date from text in various formats, preferring the one labelled DATE OF AWARD"""
+    first_date = None
+    first_short_date = None
+    for match in _DATE_RE.finditer(text):
+        day = int(match.group('day'))
+        if match.group('year'):
+            month = _MONTHS[match.group('month').lower()]
+            year = int(match.group('year'))
+        else:
+            # Handle 2-digit year
+            month = _MONTHS[match.group('short_month').lower()]
+            year = 2000 + int(match.group('short_year'))
+        
+        if not 1 <= day <= calendar.monthrange(year, month)[1]:
+            logging.warning(f"Error parsing date: {match.group(0).strip()}")
+            continue
+        
+        # Return in format matching CSV: "7-Aug-24"
+        date_str = f"{day}-{_MONTH_ABBRS[month - 1]}-{year % 100:02d}"
+        if not match.group('year'):
+            if first_short_date is None:
+                first_short_date = date_str
+        elif match.group('award'):
+            return date_str
+        elif first_date is None:
+            first_date = date_str
+    return first_date or first_short_date
+
+
+def wait_for_page_load(driver: webdriver.Chrome):
+    """Wait until the current document's DOM is ready (matches the 'eager' page load strategy)"""
+    driver._wait.until(
+        lambda d: d.execute_script('return document.readyState') in ('interactive', 'complete')
+    )
+
+
+def wait_for_popup_closed(driver: webdriver.Chrome) -> bool:
+    """Wait until no project popup is visible, returning False (and logging) on timeout"""
     try:
-        # Wait for popup to be visible (various possible selectors)
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, ".popup-content, .info-window, .details-panel"))
+        driver._wait_close.until(
+            EC.invisibility_of_element_located((By.CSS_SELECTOR, CSSSelectors.POPUP_CONTENT))
         )
-        
-        # Get all text from the popup
-        popup_text = driver.find_element(By.CSS_SELECTOR, ".popup-content, .info-window, .details-panel").text
+        return True
+    except TimeoutException:
+        logging.warning("Project popup still visible after closing")
+        return False
+
+
+def wait_for_new_popup(driver: webdriver.Chrome, previous_popup=None, previous_text: str = ""):
+    """Wait for a visible project popup that isn't the one read before, and return it"""
+    def new_popup(d):
+        popup = EC.visibility_of_element_located((By.CSS_SELECTOR, CSSSelectors.POPUP_CONTENT))(d)
+        if not popup or previous_popup is None or popup != previous_popup:
+            return popup
+        # Same element reused by the page, only accept it once its content has changed
+        try:
+            return popup if popup.text != previous_text else False
+        except StaleElementReferenceException:
+            return False
+    
+    return driver._wait.until(new_popup)
+
+
+def verify_project_date(driver: webdriver.Chrome, expected_date: str, popup_text: Optional[str] = None) -> bool:
+    """Verify that the project's award date matches what we expect"""
+    try:
+        if popup_text is None:
+            # Wait for popup to be visible (various possible selectors)
+            popup = driver._wait.until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, CSSSelectors.POPUP_CONTENT))
+            )
+            
+            # Get all text from the popup
+            popup_text = popup.text
         
         # Extract date from the text
         found_date = extract_date_from_text(popup_text)
@@ -212,23 +461,33 @@ def verify_project_date(driver: webdriver.Chrome, expected_date: str) -> bool:
 def search_for_project(driver: webdriver.Chrome, project_name: str, expected_date: str) -> bool:
     """Search for a project on the URA website with sequential search result checking"""
     try:
-        # Navigate to URA GLS website
-        driver.get("https://eservice.ura.gov.sg/maps/?service=GLSRELEASE")
-        time.sleep(3)  # Wait for page to load completely
+        # Navigate to URA GLS website, only if this driver hasn't loaded the map page yet
+        if not getattr(driver, '_ura_loaded', False):
+            driver.get(URA_MAPS_URL)
+            wait_for_page_load(driver)
+            driver._ura_loaded = True
+        
+        # Results from the previous search, which must be replaced before we read the new ones
+        previous_results = driver.find_elements(By.XPATH, XPaths.SEARCH_RESULT_ITEMS)
         
         # Find and clear search box
-        search_box = WebDriverWait(driver, 15).until(
+        search_box = driver._wait.until(
             EC.element_to_be_clickable((By.XPATH, XPaths.SEARCH_BOX))
         )
         search_box.clear()
         search_box.send_keys(project_name)
         search_box.send_keys(Keys.RETURN)
-        time.sleep(3)  # Wait for search results to load
         
         # Find all search result items
         try:
+            if previous_results:
+                try:
+                    driver._wait.until(EC.staleness_of(previous_results[0]))
+                except TimeoutException:
+                    logging.warning("Previous search results were not replaced")
+            
             # Wait for search results to appear
-            WebDriverWait(driver, 10).until(
+            driver._wait.until(
                 EC.presence_of_element_located((By.XPATH, XPaths.SEARCH_RESULTS_CONTAINER))
             )
             
@@ -240,6 +499,17 @@ def search_for_project(driver: webdriver.Chrome, project_name: str, expected_dat
                 logging.warning(f"No search results found for '{project_name}'")
                 return False
             
+            # Popup read for the previous result (or left over from the previous project),
+            # so a lingering one is never mistaken for the next
+            previous_popup, previous_text = None, ""
+            for popup in driver.find_elements(By.CSS_SELECTOR, CSSSelectors.POPUP_CONTENT):
+                try:
+                    if popup.is_displayed():
+                        previous_popup, previous_text = popup, popup.text
+                        break
+                except StaleElementReferenceException:
+                    continue
+            
             # Try each search result one by one
             for i, result in enumerate(result_items):
                 try:
@@ -247,10 +517,13 @@ def search_for_project(driver: webdriver.Chrome, project_name: str, expected_dat
                     
                     # Click on the search result
                     driver.execute_script("arguments[0].click();", result)
-                    time.sleep(2)  # Wait for details to load
+                    
+                    # Wait for details to load
+                    popup = wait_for_new_popup(driver, previous_popup, previous_text)
+                    previous_popup, previous_text = popup, popup.text
                     
                     # Verify if the date matches
-                    if verify_project_date(driver, expected_date):
+                    if verify_project_date(driver, expected_date, previous_text):
                         logging.info(f"Found matching project: '{project_name}' with date '{expected_date}'")
                         return True
                     
@@ -259,18 +532,24 @@ def search_for_project(driver: webdriver.Chrome, project_name: str, expected_dat
                     
                     # Close the popup
                     try:
-                        close_buttons = driver.find_elements(By.XPATH, XPaths.CLOSE_BUTTON)
-                        if close_buttons:
-                            driver.execute_script("arguments[0].click();", close_buttons[0])
-                        else:
+                        try:
+                            close_button = driver._wait_short.until(
+                                EC.presence_of_element_located((By.XPATH, XPaths.CLOSE_BUTTON))
+                            )
+                            driver.execute_script("arguments[0].click();", close_button)
+                        except TimeoutException:
                             # Try pressing Escape key
                             webdriver.ActionChains(driver).send_keys(Keys.ESCAPE).perform()
                     except Exception as e:
                         logging.warning(f"Error closing popup: {str(e)}")
                         # Try to recover by going back to search results
                         driver.execute_script("history.back();")
+                        driver._ura_loaded = False
                     
-                    time.sleep(2)  # Wait before trying next result
+                    # Wait for the popup to disappear before trying next result, reload if it won't close
+                    if not wait_for_popup_closed(driver):
+                        driver._ura_loaded = False
+                        return False
                 
                 except Exception as e:
                     logging.error(f"Error processing search result {i+1}: {str(e)}")
@@ -282,59 +561,123 @@ def search_for_project(driver: webdriver.Chrome, project_name: str, expected_dat
             
         except Exception as e:
             logging.error(f"Error finding search results: {str(e)}")
+            # Reload the page for the next search in case it is in a bad state
+            driver._ura_loaded = False
             return False
         
     except Exception as e:
         logging.error(f"Error in search_for_project: {str(e)}")
+        driver._ura_loaded = False
         return False
 
 
+def download_pdf(driver: webdriver.Chrome, pdf_url: str) -> Optional[bytes]:
+    """Download a PDF using the browser's cookies, returning None if it cannot be fetched"""
+    if requests is None:
+        return None
+    
+    session = getattr(_thread_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        session.headers['User-Agent'] = driver.execute_script('return navigator.userAgent')
+        _thread_local.session = session
+    
+    for cookie in driver.get_cookies():
+        session.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain'), path=cookie.get('path', '/'))
+    
+    try:
+        response = session.get(pdf_url, timeout=30)
+        response.raise_for_status()
+    except Exception as e:
+        logging.warning(f"Error downloading PDF {pdf_url}: {str(e)}")
+        return None
+    
+    if not response.content.startswith(b'%PDF'):
+        logging.warning(f"Response from {pdf_url} is not a PDF")
+        return None
+    return response.content
+
+
+def extract_text_from_pdf_bytes(pdf_data: bytes) -> str:
+    """Extract the embedded text layer of a PDF"""
+    try:
+        with pdfplumber.open(io.BytesIO(pdf_data)) as pdf:
+            return "\n".join(page.extract_text() or "" for page in pdf.pages).strip()
+    except Exception as e:
+        logging.warning(f"pdfplumber failed: {str(e)}")
+        return ""
+
+
+def ocr_pdf_bytes(pdf_data: bytes) -> str:
+    """OCR a scanned PDF by rendering its pages to images"""
+    if convert_from_bytes is None:
+        return ""
+    # Don't render pages at 300 dpi if there's nothing to OCR them with
+    if get_thread_ocr_api() is None and not _TESSERACT_OK:
+        return ""
+    try:
+        pages = convert_from_bytes(pdf_data, dpi=300)
+        return "\n".join(ocr_image(preprocess_for_ocr(page)) for page in pages)
+    except Exception as e:
+        logging.error(f"OCR of downloaded PDF failed: {str(e)}")
+        return ""
+
+
 def extract_text_from_pdf(driver: webdriver.Chrome, pdf_url: str) -> str:
-    """Extract text from PDF using various methods"""
+    """Extract text from PDF, preferring the downloaded file over the browser viewer"""
+    pdf_data = download_pdf(driver, pdf_url)
+    if pdf_data:
+        text = extract_text_from_pdf_bytes(pdf_data)
+        if not text:
+            # No text layer, most likely a scanned PDF
+            text = ocr_pdf_bytes(pdf_data)
+        if text:
+            return text
+    
+    return extract_text_from_pdf_viewer(driver, pdf_url)
+
+
+def extract_text_from_pdf_viewer(driver: webdriver.Chrome, pdf_url: str) -> str:
+    """Extract text from PDF opened in the browser using various methods"""
     try:
         # Open the PDF in a new tab
         original_window = driver.current_window_handle
         driver.execute_script(f"window.open('{pdf_url}', '_blank');")
         
         # Switch to new tab
-        WebDriverWait(driver, 10).until(EC.number_of_windows_to_be(2))
+        driver._wait.until(EC.number_of_windows_to_be(2))
         for window_handle in driver.window_handles:
             if window_handle != original_window:
                 driver.switch_to.window(window_handle)
                 break
         
-        time.sleep(5)  # Wait for PDF to load
+        # Wait for PDF to load
+        wait_for_page_load(driver)
         
         # Try multiple methods to extract text
         text = ""
         
         # Method 1: Try to get text directly from PDF viewer
         try:
-            pdf_frame = driver.find_element(By.XPATH, XPaths.PDF_FRAME)
+            pdf_frame = driver._wait.until(
+                EC.presence_of_element_located((By.XPATH, XPaths.PDF_FRAME))
+            )
             driver.switch_to.frame(pdf_frame)
             text_elements = driver.find_elements(By.XPATH, "//span[contains(@class, 'text')]")
             text = "\n".join([elem.text for elem in text_elements])
             driver.switch_to.default_content()
-        except:
-            pass
+        except Exception as e:
+            logging.debug(f"Could not read text from PDF viewer: {str(e)}")
         
         # Method 2: Use OCR if direct text extraction fails
-        if not text:
+        if not text and _TESSERACT_OK:
             try:
-                # Check if Tesseract is available
-                try:
-                    pytesseract.get_tesseract_version()
-                except pytesseract.TesseractNotFoundError:
-                    logging.error("Tesseract is not installed or not found in PATH")
-                    logging.error("Please install Tesseract OCR from https://github.com/UB-Mannheim/tesseract/wiki")
-                    return ""
-                
                 # Take screenshot of the PDF
                 screenshot = driver.get_screenshot_as_png()
-                image = Image.open(io.BytesIO(screenshot))
+                image = preprocess_for_ocr(Image.open(io.BytesIO(screenshot)))
                 
                 # Use OCR
-                text = pytesseract.image_to_string(image)
+                text = ocr_image(image)
             except Exception as e:
                 logging.error(f"OCR failed: {str(e)}")
         
@@ -360,23 +703,24 @@ def extract_tenderers_from_pdf_text(pdf_text: str) -> Tuple[str, List[str]]:
     other_tenderers = []
     
     lines = pdf_text.split('\n')
+    upper_lines = pdf_text.upper().split('\n')
     found_table = False
     
-    for i, line in enumerate(lines):
+    for i, (line, upper_line) in enumerate(zip(lines, upper_lines)):
         # Look for table headers or successful tenderer section
-        if "SUCCESSFUL TENDERER" in line.upper():
+        if "SUCCESSFUL TENDERER" in upper_line:
             # Extract successful tenderer from following lines
             if i + 1 < len(lines):
                 successful_tenderer = lines[i + 1].strip()
         
         # Look for ranking table
-        if "RANKING" in line.upper() and "NAME OF TENDERER" in line.upper():
+        if "RANKING" in upper_line and "NAME OF TENDERER" in upper_line:
             found_table = True
             continue
         
         if found_table:
             # Match ranking (1, 2, 3, etc.) followed by company name
-            match = re.match(r'^\s*(\d+)\s+(.+)$', line.strip())
+            match = _RANKING_RE.match(line.strip())
             if match:
                 ranking = int(match.group(1))
                 company_name = match.group(2).strip()
@@ -397,7 +741,7 @@ def extract_tenderers(driver: webdriver.Chrome) -> Tuple[str, List[str]]:
     try:
         # Find tender results link
         try:
-            tender_results_link = WebDriverWait(driver, 10).until(
+            tender_results_link = driver._wait.until(
                 EC.element_to_be_clickable((By.XPATH, XPaths.TENDER_RESULTS_LINK))
             )
             pdf_url = tender_results_link.get_attribute('href')
@@ -414,10 +758,14 @@ def extract_tenderers(driver: webdriver.Chrome) -> Tuple[str, List[str]]:
         # If we didn't get successful tenderer from PDF, try to get it from the page
         if not successful_tenderer:
             try:
-                successful_element = driver.find_element(By.XPATH, XPaths.SUCCESSFUL_TENDERER)
+                successful_element = driver._wait_short.until(
+                    EC.presence_of_element_located((By.XPATH, XPaths.SUCCESSFUL_TENDERER))
+                )
                 successful_tenderer = successful_element.text.strip()
-            except:
+            except TimeoutException:
                 pass
+            except Exception as e:
+                logging.warning(f"Error reading successful tenderer from page: {str(e)}")
         
         return successful_tenderer, other_tenderers
         
@@ -426,8 +774,11 @@ def extract_tenderers(driver: webdriver.Chrome) -> Tuple[str, List[str]]:
         return "", []
 
 
-def process_project(driver: webdriver.Chrome, project_info: dict) -> dict:
-    """Process a single project and extract tenderer information"""
+def process_project(project_info: dict, driver: Optional[webdriver.Chrome] = None) -> Tuple[dict, bool]:
+    """Process a single project and extract tenderer information, returning whether it was found"""
+    if driver is None:
+        driver = get_thread_driver()
+    
     project_name = project_info.get('Location', '')
     raw_date = project_info.get('Date of Award', '')
     num_bids = project_info.get('Number of Bids', 0)
@@ -437,8 +788,10 @@ def process_project(driver: webdriver.Chrome, project_info: dict) -> dict:
     
     logging.info(f"Processing project: {project_name} (Original date: {raw_date}, Formatted date: {expected_date}, {num_bids} bids)")
     
+    found = False
     if search_for_project(driver, project_name, expected_date):
         successful_tenderer, other_tenderers = extract_tenderers(driver)
+        found = bool(successful_tenderer)
         
         # Update project info
         project_info['Name of Successful Tenderer'] = successful_tenderer
@@ -452,13 +805,77 @@ def process_project(driver: webdriver.Chrome, project_info: dict) -> dict:
         
         # Close project popup
         try:
-            close_button = driver.find_element(By.XPATH, XPaths.CLOSE_BUTTON)
+            close_button = driver._wait_short.until(
+                EC.element_to_be_clickable((By.XPATH, XPaths.CLOSE_BUTTON))
+            )
             close_button.click()
-            time.sleep(1)
-        except:
-            pass
+            if not wait_for_popup_closed(driver):
+                driver._ura_loaded = False
+        except TimeoutException:
+            # No close button, reload the page so the popup doesn't carry over to the next project
+            driver._ura_loaded = False
+        except Exception as e:
+            logging.warning(f"Error closing project popup: {str(e)}")
+            driver._ura_loaded = False
+        
+        # Leave the search box empty for the next project on this driver
+        try:
+            driver.execute_script(f"document.querySelector('{CSSSelectors.SEARCH_BOX}').value = '';")
+        except Exception as e:
+            logging.warning(f"Error clearing search box: {str(e)}")
+            driver._ura_loaded = False
     
-    return project_info
+    return project_info, found
+
+
+def project_key(project_info: dict) -> Tuple[str, str]:
+    """Key identifying a project in the checkpoint cache"""
+    return str(project_info.get('Location', '')), str(project_info.get('Date of Award', ''))
+
+
+def load_cache() -> dict:
+    """Load previously processed projects from the checkpoint cache, keyed by project_key"""
+    cache = {}
+    if not os.path.exists(CACHE_FILE):
+        return cache
+    
+    with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                project_info = json.loads(line)
+            except json.JSONDecodeError as e:
+                logging.warning(f"Skipping invalid cache line {line_number}: {str(e)}")
+                continue
+            cache[project_key(project_info)] = project_info
+    
+    logging.info(f"Loaded {len(cache)} processed projects from {CACHE_FILE}")
+    return cache
+
+
+def append_to_cache(project_info: dict):
+    """Append a processed project to the checkpoint cache, syncing it to disk straight away"""
+    line = json.dumps(project_info, default=str) + '\n'
+    with _cache_lock:
+        # A line torn by a crash is skipped by load_cache
+        with open(CACHE_FILE, 'a', encoding='utf-8') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def process_and_cache_project(project_info: dict) -> dict:
+    """Process a project on the current thread's driver and checkpoint it if tenderers were found"""
+    updated_project, found = process_project(project_info)
+    if found:
+        try:
+            append_to_cache(updated_project)
+        except Exception as e:
+            logging.warning(f"Error writing {project_info.get('Location', '')} to cache: {str(e)}")
+    
+    time.sleep(PROJECT_DELAY_SECONDS)  # Add delay between projects to avoid overloading the server
+    return updated_project
 
 
 def main():
@@ -478,46 +895,53 @@ def main():
         df = pd.read_excel(excel_file)
         
         # Identify projects needing tenderer information
-        projects_to_process = []
-        for _, row in df.iterrows():
-            num_bids = row.get('Number of Bids', 0)
-            if num_bids > 1 and pd.isna(row.get('Name of Other Participating Tenderer - 1', None)):
-                projects_to_process.append(row.to_dict())
+        mask = (df['Number of Bids'] > 1) & df['Name of Other Participating Tenderer - 1'].isna()
+        pending_projects = df.loc[mask].to_dict(orient='records')
         
-        logging.info(f"Found {len(projects_to_process)} projects needing tenderer information")
-        
-        # Set up driver
-        driver = setup_driver()
+        logging.info(f"Found {len(pending_projects)} projects needing tenderer information")
         
-        # Process each project
+        # Reuse results from previous runs and only scrape the rest
+        cache = load_cache()
         updated_projects = []
-        for project in projects_to_process:
-            updated_project = process_project(driver, project)
-            updated_projects.append(updated_project)
-            time.sleep(2)  # Add delay between projects to avoid overloading the server
-        
-        # Update DataFrame
-        for updated_project in updated_projects:
-            # Find and update the row in the original DataFrame
-            location = updated_project['Location']
-            date = updated_project['Date of Award']
-            mask = (df['Location'] == location) & (df['Date of Award'] == date)
-            
-            if mask.any():
-                for column, value in updated_project.items():
-                    df.loc[mask, column] = value
+        projects_to_process = []
+        for project in pending_projects:
+            cached = cache.get(project_key(project))
+            if cached is None:
+                projects_to_process.append(project)
+            else:
+                updated_projects.append({**project, **{c: cached[c] for c in TENDERER_COLUMNS if c in cached}})
+        
+        if updated_projects:
+            logging.info(f"Skipping {len(updated_projects)} projects already processed in a previous run")
+        
+        # Process projects in parallel, each worker thread using its own driver
+        num_workers = max(1, min(MAX_WORKERS, len(projects_to_process)))
+        with ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix='ura-worker') as executor:
+            updated_projects.extend(executor.map(process_and_cache_project, projects_to_process))
+        
+        # Update DataFrame with a single left merge keyed on (Location, Date of Award)
+        if updated_projects:
+            key = ['Location', 'Date of Award']
+            updates = pd.DataFrame(updated_projects)
+            update_columns = [c for c in TENDERER_COLUMNS if c in updates.columns]
+            updates = updates[key + update_columns].drop_duplicates(subset=key, keep='last')
+            merged = df.merge(updates, on=key, how='left', suffixes=('', '_u'))
+            for column in update_columns:
+                if column in df.columns:
+                    df[column] = merged[column + '_u'].combine_first(merged[column]).values
+                else:
+                    df[column] = merged[column].values
         
         # Save updated Excel file
         output_file = r'"C:\Users\nikki\Documents\GitHub\Participating_Tenderers_Scraper\ura_sites_interim_results.xlsx"'
         df.to_excel(output_file, index=False)
         logging.info(f"Saved updated data to {output_file}")
         
-        driver.quit()
-        
     except Exception as e:
         logging.error(f"Error in main function: {str(e)}")
-        if 'driver' in locals():
-            driver.quit()
+    finally:
+        quit_drivers()
+        close_ocr_apis()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,30 @@
+import pytest
+
+from main import extract_date_from_text
+
+
+@pytest.mark.parametrize("text, expected", [
+    # Numbers followed by a word must not swallow the day of the real date
+    ("Site area 1.5 ha\n12 March 2024", "12-Mar-24"),
+    ("Parcel 3 at 12 August 2024", "12-Aug-24"),
+    ("Plot 4 of 12 March 2024", "12-Mar-24"),
+    ("5 storeys 20 March 2024", "20-Mar-24"),
+    # DATE OF AWARD wins over an earlier date
+    ("Launched 3 March 2024\nDATE OF AWARD: 7 August 2024", "7-Aug-24"),
+    # 4-digit years win over the short 7-Aug-24 form
+    ("Closed 12-Jan-24, awarded 7 August 2024", "7-Aug-24"),
+    ("Awarded 7-Aug-24", "7-Aug-24"),
+    ("1 Sept 2023", "1-Sep-23"),
+])
+def test_extract_date_from_text(text, expected):
+    assert extract_date_from_text(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "No date here",
+    "12 Jan 24",
+    "7 Marchxyz 2024",
+    "31 Feb 2024",
+])
+def test_extract_date_from_text_no_match(text):
+    assert extract_date_from_text(text) is None